@@ -1,9 +1,16 @@
+import os
 import streamlit as st
-import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from src.calculator.cash_flow import CashFlowCalculator
+from src.calculator.debt import DebtCalculator
+from src.utils.cache import ResultCache
+from src.utils.formatters import format_currency, format_percent, format_scenarios
+from src.utils.scenarios import load_scenarios
+
+SCENARIO_LIBRARY = os.path.join(os.path.dirname(__file__), 'data', 'sample_scenarios.json')
+
 # Page config
 st.set_page_config(
     page_title="Cash Flow Simulator",
@@ -31,49 +38,87 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Calculator Functions
-def calculate_wealth_projection(income, expenses, savings_rate, years, 
-                                investment_return, inflation_rate, income_growth):
-    months = years * 12
-    wealth = 0
-    total_contrib = 0
-    current_income = income
-    
-    monthly_return = investment_return / 12
-    monthly_inflation = inflation_rate / 12
-    monthly_income_growth = income_growth / 12
-    
-    data = {
-        'month': [],
-        'year': [],
-        'nominal_wealth': [],
-        'real_wealth': [],
-        'total_contributions': [],
-        'investment_gains': [],
-        'income': [],
-        'monthly_savings': []
-    }
+def calculate_wealth_projection(income, expenses, savings_rate, years,
+                                investment_return, inflation_rate, income_growth,
+                                loan_balance=0, loan_rate=0, loan_term=0,
+                                resolution='annual', start_year=0, start_row=None):
+    """Annual year-end rows, or monthly rows for the years after start_year."""
+    calculator = CashFlowCalculator(income, expenses, savings_rate)
+    
+    debt_payments = None
+    if loan_balance > 0 and loan_term > 0:
+        # Loan payments come out of savings until the loan is paid off
+        schedule = DebtCalculator.amortization_schedule(loan_balance, loan_rate, loan_term * 12)
+        debt_payments = DebtCalculator.payment_stream(schedule, years * 12)
+    
+    if resolution == 'annual':
+        df = calculator.calculate_wealth_projection(
+            years, investment_return, inflation_rate, income_growth,
+            debt_payments=debt_payments, resolution='annual'
+        )
+    else:
+        df = calculator.calculate_monthly_detail(
+            start_year, years, investment_return, inflation_rate, income_growth,
+            debt_payments=debt_payments, start_row=start_row
+        )
     
-    for month in range(1, months + 1):
-        if month % 12 == 0:
-            current_income *= (1 + income_growth)
-        
-        monthly_savings = current_income * savings_rate / 12
-        wealth = wealth * (1 + monthly_return) + monthly_savings
-        total_contrib += monthly_savings
-        
-        real_wealth = wealth / ((1 + monthly_inflation) ** month)
-        investment_gains = wealth - total_contrib
-        
-        data['month'].append(month)
-        data['year'].append(month / 12)
-        data['nominal_wealth'].append(wealth)
-        data['real_wealth'].append(real_wealth)
-        data['total_contributions'].append(total_contrib)
-        data['investment_gains'].append(investment_gains)
-        data['income'].append(current_income)
-        data['monthly_savings'].append(monthly_savings)
-    
-    return pd.DataFrame(data)
+    df['year'] = df['month'] / 12
+    # Invested each month: savings left after loan payments, which never draw on investments
+    df['monthly_savings'] = (df['income'] * savings_rate / 12 - df['debt_payment']).clip(lower=0)
+    return df
+
+@st.cache_resource
+def get_result_cache():
+    return ResultCache()
+
+def cached_wealth_projection(income, expenses, savings_rate, years,
+                             investment_return, inflation_rate, income_growth,
+                             loan_balance=0, loan_rate=0, loan_term=0,
+                             resolution='annual', start_year=0):
+    # Shared across sessions and restarts, so common scenarios are computed once
+    params = {
+        'income': income,
+        'expenses': expenses,
+        'savings_rate': savings_rate,
+        'years': years,
+        'investment_return': investment_return,
+        'inflation_rate': inflation_rate,
+        'income_growth': income_growth,
+        'loan_balance': loan_balance,
+        'loan_rate': loan_rate,
+        'loan_term': loan_term,
+        'resolution': resolution,
+        'start_year': start_year
+    }
+    return get_result_cache().get_or_compute(
+        'app.wealth_projection', params,
+        lambda: calculate_wealth_projection(**params)
+    )
+
+def first_month(annual_df, condition, **projection):
+    """
+    Month in which condition(df) first holds, or None.
+
+    The year is found from the annual rows; only that year is then
+    expanded to monthly detail, resuming from the previous year-end row.
+    """
+    hits = annual_df[condition(annual_df)]
+    if hits.empty:
+        return None
+    year = int(hits['month'].iloc[0] // 12)
+    detail = calculate_wealth_projection(
+        **{**projection, 'years': year}, resolution='monthly', start_year=year - 1,
+        start_row=annual_df.iloc[year - 2] if year > 1 else None
+    )
+    return int(detail[condition(detail)]['month'].iloc[0])
+
+@st.cache_data
+def load_presets(path):
+    return load_scenarios(path).set_index('name')
+
+def slider_default(value, min_value, max_value):
+    # Library presets may lie outside the slider ranges, which Streamlit rejects
+    return min(max(value, min_value), max_value)
 
 def calculate_fire_number(annual_expenses, withdrawal_rate=0.04):
     return annual_expenses / withdrawal_rate
@@ -85,11 +130,21 @@ st.markdown("### Visualize Your Financial Future Through the Power of Compoundin
 # Sidebar - Input Parameters
 st.sidebar.header("📊 Input Parameters")
 
+presets = load_presets(SCENARIO_LIBRARY)
+preset = presets.loc[st.sidebar.selectbox(
+    "Preset Scenario",
+    presets.index,
+    help="Starting values from the scenario library"
+)]
+
+with st.sidebar.expander("📚 Scenario Library"):
+    st.dataframe(format_scenarios(presets), use_container_width=True)
+
 with st.sidebar.expander("💵 Income & Expenses", expanded=True):
     annual_income = st.number_input(
         "Annual Income ($)",
         min_value=0,
-        value=60000,
+        value=int(preset['income']),
         step=5000,
         help="Your gross annual income"
     )
@@ -97,7 +152,7 @@ with st.sidebar.expander("💵 Income & Expenses", expanded=True):
     annual_expenses = st.number_input(
         "Annual Expenses ($)",
         min_value=0,
-        value=36000,
+        value=int(preset['expenses']),
         step=1000,
         help="Your total annual expenses"
     )
@@ -106,7 +161,7 @@ with st.sidebar.expander("💵 Income & Expenses", expanded=True):
         "Savings Rate (%)",
         min_value=0,
         max_value=100,
-        value=30,
+        value=slider_default(int(round(preset['savings_rate'] * 100)), 0, 100),
         help="Percentage of income you save"
     ) / 100
 
@@ -115,7 +170,7 @@ with st.sidebar.expander("📈 Investment Parameters", expanded=True):
         "Expected Annual Return (%)",
         min_value=0.0,
         max_value=20.0,
-        value=7.0,
+        value=slider_default(round(float(preset['investment_return']) * 100, 1), 0.0, 20.0),
         step=0.5,
         help="Historical S&P 500: ~10%"
     ) / 100
@@ -124,7 +179,7 @@ with st.sidebar.expander("📈 Investment Parameters", expanded=True):
         "Annual Inflation Rate (%)",
         min_value=0.0,
         max_value=10.0,
-        value=3.0,
+        value=slider_default(round(float(preset['inflation_rate']) * 100, 1), 0.0, 10.0),
         step=0.5
     ) / 100
     
@@ -132,7 +187,7 @@ with st.sidebar.expander("📈 Investment Parameters", expanded=True):
         "Annual Income Growth (%)",
         min_value=0.0,
         max_value=10.0,
-        value=3.0,
+        value=slider_default(round(float(preset['income_growth']) * 100, 1), 0.0, 10.0),
         step=0.5,
         help="Expected annual salary increases"
     ) / 100
@@ -142,20 +197,51 @@ with st.sidebar.expander("⏱️ Time Horizon"):
         "Years to Simulate",
         min_value=5,
         max_value=50,
-        value=30,
+        value=slider_default(int(preset['years']), 5, 50),
         help="Investment time horizon"
     )
 
-# Calculate
-df = calculate_wealth_projection(
-    annual_income, annual_expenses, savings_rate, years,
-    investment_return, inflation_rate, income_growth
+with st.sidebar.expander("🏠 Loans & Mortgage"):
+    loan_balance = st.number_input(
+        "Outstanding Balance ($)",
+        min_value=0,
+        value=0,
+        step=5000,
+        help="Mortgage or other loan paid from your savings"
+    )
+    
+    loan_rate = st.slider(
+        "Loan Interest Rate (%)",
+        min_value=0.0,
+        max_value=15.0,
+        value=5.0,
+        step=0.25
+    ) / 100
+    
+    loan_term = st.slider(
+        "Remaining Term (Years)",
+        min_value=1,
+        max_value=40,
+        value=25
+    )
+
+loan_params = dict(loan_balance=loan_balance, loan_rate=loan_rate, loan_term=loan_term)
+if loan_balance > 0 and DebtCalculator.monthly_payment(loan_balance, loan_rate, loan_term * 12) > annual_income * savings_rate / 12:
+    st.sidebar.warning("Loan payments exceed your monthly savings; the difference is assumed to come from outside your savings.")
+
+# Calculate: year-end rows drive the page, monthly rows are only fetched on request
+projection = dict(
+    income=annual_income, expenses=annual_expenses, savings_rate=savings_rate, years=years,
+    investment_return=investment_return, inflation_rate=inflation_rate,
+    income_growth=income_growth, **loan_params
 )
+df = cached_wealth_projection(**projection)
 
 fire_number = calculate_fire_number(annual_expenses)
 final_wealth = df['nominal_wealth'].iloc[-1]
 final_real_wealth = df['real_wealth'].iloc[-1]
 total_contributions = df['total_contributions'].iloc[-1]
+total_debt_paid = df['total_debt_paid'].iloc[-1]
 total_gains = df['investment_gains'].iloc[-1]
 
 # Key Metrics
@@ -165,29 +251,29 @@ col1, col2, col3, col4 = st.columns(4)
 with col1:
     st.metric(
         "Final Wealth (Nominal)",
-        f"${final_wealth:,.0f}",
-        f"+${final_wealth - total_contributions:,.0f}"
+        format_currency(final_wealth),
+        "+" + format_currency(total_gains)
     )
 
 with col2:
     st.metric(
         "Final Wealth (Real)",
-        f"${final_real_wealth:,.0f}",
+        format_currency(final_real_wealth),
         "Inflation-Adjusted"
     )
 
 with col3:
     st.metric(
         "Total Contributions",
-        f"${total_contributions:,.0f}",
-        f"{savings_rate*100:.0f}% savings rate"
+        format_currency(total_contributions),
+        f"{format_percent(savings_rate, 0)} savings rate"
     )
 
 with col4:
     st.metric(
         "Investment Gains",
-        f"${total_gains:,.0f}",
-        f"{(total_gains/total_contributions)*100:.1f}% return"
+        format_currency(total_gains),
+        f"{format_percent(total_gains / total_contributions)} return"
     )
 
 # FIRE Analysis
@@ -195,14 +281,14 @@ st.header("🔥 FIRE Analysis")
 col1, col2, col3 = st.columns(3)
 
 with col1:
-    st.metric("FIRE Number", f"${fire_number:,.0f}")
+    st.metric("FIRE Number", format_currency(fire_number))
 
 with col2:
     fire_progress = min((final_real_wealth / fire_number) * 100, 100)
-    st.metric("FIRE Progress", f"{fire_progress:.1f}%")
+    st.metric("FIRE Progress", format_percent(fire_progress / 100))
 
 with col3:
-    months_to_fire = df[df['real_wealth'] >= fire_number]['month'].min() if any(df['real_wealth'] >= fire_number) else None
+    months_to_fire = first_month(df, lambda d: d['real_wealth'] >= fire_number, **projection)
     if months_to_fire:
         st.metric("Years to FIRE", f"{months_to_fire/12:.1f} years")
     else:
@@ -211,22 +297,25 @@ with col3:
 # Main Visualization
 st.header("📈 Wealth Growth Projection")
 
+monthly_detail = st.toggle("Show monthly detail", help="Plot and export every month instead of year-end values")
+chart_df = cached_wealth_projection(**projection, resolution='monthly') if monthly_detail else df
+
 tab1, tab2, tab3, tab4 = st.tabs(["Wealth Growth", "Contributions vs Gains", "Income & Savings", "Comparison"])
 
 with tab1:
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
-        x=df['year'],
-        y=df['nominal_wealth'],
+        x=chart_df['year'],
+        y=chart_df['nominal_wealth'],
         name='Nominal Wealth',
         line=dict(color='#1f77b4', width=3),
         fill='tozeroy'
     ))
     
     fig.add_trace(go.Scatter(
-        x=df['year'],
-        y=df['real_wealth'],
+        x=chart_df['year'],
+        y=chart_df['real_wealth'],
         name='Real Wealth (Inflation-Adjusted)',
         line=dict(color='#ff7f0e', width=3, dash='dash')
     ))
@@ -254,16 +343,16 @@ with tab2:
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
-        x=df['year'],
-        y=df['total_contributions'],
+        x=chart_df['year'],
+        y=chart_df['total_contributions'],
         name='Your Contributions',
         fill='tozeroy',
         line=dict(color='#2ca02c', width=2)
     ))
     
     fig.add_trace(go.Scatter(
-        x=df['year'],
-        y=df['investment_gains'],
+        x=chart_df['year'],
+        y=chart_df['investment_gains'],
         name='Investment Gains',
         fill='tonexty',
         line=dict(color='#9467bd', width=2)
@@ -284,7 +373,8 @@ with tab2:
     with col1:
         st.info(f"""
         **Your Contributions:** ${total_contributions:,.0f}  
-        ({(total_contributions/final_wealth)*100:.1f}% of final wealth)
+        (${total_contributions - total_debt_paid:,.0f} invested after loan payments,
+        {((total_contributions - total_debt_paid)/final_wealth)*100:.1f}% of final wealth)
         """)
     with col2:
         st.success(f"""
@@ -299,12 +389,10 @@ with tab3:
         vertical_spacing=0.15
     )
     
-    annual_data = df[df['month'] % 12 == 0]
-    
     fig.add_trace(
         go.Scatter(
-            x=annual_data['year'],
-            y=annual_data['income'],
+            x=df['year'],
+            y=df['income'],
             name='Annual Income',
             line=dict(color='#1f77b4', width=3)
         ),
@@ -313,8 +401,8 @@ with tab3:
     
     fig.add_trace(
         go.Scatter(
-            x=df['year'],
-            y=df['monthly_savings'],
+            x=chart_df['year'],
+            y=chart_df['monthly_savings'],
             name='Monthly Savings',
             line=dict(color='#2ca02c', width=3),
             fill='tozeroy'
@@ -342,26 +430,26 @@ with tab4:
     
     # Higher savings
     if savings_rate < 0.5:
-        higher_savings_df = calculate_wealth_projection(
+        higher_savings_df = cached_wealth_projection(
             annual_income, annual_expenses, min(savings_rate + 0.1, 0.5),
-            years, investment_return, inflation_rate, income_growth
+            years, investment_return, inflation_rate, income_growth, **loan_params
         )
         scenarios.append(higher_savings_df['nominal_wealth'].values)
         scenario_names.append(f"+10% Savings ({min(savings_rate + 0.1, 0.5)*100:.0f}%)")
     
     # Better returns
-    better_return_df = calculate_wealth_projection(
+    better_return_df = cached_wealth_projection(
         annual_income, annual_expenses, savings_rate,
-        years, investment_return + 0.02, inflation_rate, income_growth
+        years, investment_return + 0.02, inflation_rate, income_growth, **loan_params
     )
     scenarios.append(better_return_df['nominal_wealth'].values)
     scenario_names.append(f"+2% Returns ({(investment_return + 0.02)*100:.1f}%)")
     
     # Lower savings
     if savings_rate > 0.1:
-        lower_savings_df = calculate_wealth_projection(
+        lower_savings_df = cached_wealth_projection(
             annual_income, annual_expenses, max(savings_rate - 0.1, 0.05),
-            years, investment_return, inflation_rate, income_growth
+            years, investment_return, inflation_rate, income_growth, **loan_params
         )
         scenarios.append(lower_savings_df['nominal_wealth'].values)
         scenario_names.append(f"-10% Savings ({max(savings_rate - 0.1, 0.05)*100:.0f}%)")
@@ -407,9 +495,9 @@ with col1:
     """)
     
     # Calculate the crossover point
-    crossover = df[df['investment_gains'] > df['total_contributions']]['year'].min()
-    if pd.notna(crossover):
-        st.success(f"✨ In your scenario, investment gains surpass contributions at year {crossover:.1f}")
+    crossover = first_month(df, lambda d: d['investment_gains'] > d['total_contributions'], **projection)
+    if crossover:
+        st.success(f"✨ In your scenario, investment gains surpass contributions at year {crossover/12:.1f}")
 
 with col2:
     st.subheader("Key Insights from Your Simulation")
@@ -441,7 +529,7 @@ st.header("💾 Export Your Data")
 col1, col2 = st.columns(2)
 
 with col1:
-    csv = df.to_csv(index=False)
+    csv = chart_df.to_csv(index=False)
     st.download_button(
         label="📥 Download CSV",
         data=csv,
@@ -464,6 +552,7 @@ Results:
 Final Wealth (Nominal): ${final_wealth:,.0f}
 Final Wealth (Real): ${final_real_wealth:,.0f}
 Total Contributions: ${total_contributions:,.0f}
+Loan Payments from Savings: ${total_debt_paid:,.0f}
 Investment Gains: ${total_gains:,.0f}
 Gain Ratio: {gain_ratio:.2f}x
 
@@ -1,3 +1,5 @@
+import os
+
 # Default configuration values
 DEFAULT_INCOME = 50000
 DEFAULT_EXPENSES = 30000
@@ -12,4 +14,14 @@ CHART_WIDTH = 800
 COLOR_PALETTE = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
 
 # Calculation constants
-MONTHS_PER_YEAR = 12
\ No newline at end of file
+MONTHS_PER_YEAR = 12
+
+# Bump whenever projection output changes so cached results are not reused
+ENGINE_VERSION = "3"
+
+# Result cache settings
+CACHE_DIR = os.environ.get(
+    'CASHFLOW_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'cashflow-simulator')
+)
+CACHE_MAX_BYTES = 256 * 1024 * 1024
@@ -1,6 +1,12 @@
+import warnings
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from src.calculator.precision import (
+    ACCURACY_SAMPLE_SIZE, FLOAT32_TOLERANCE, compensated_add, compensated_mul_add,
+    max_relative_error, resolve_dtype, split
+)
 
 class CashFlowCalculator:
     def __init__(self, income: float, expenses: float, savings_rate: float):
@@ -14,55 +20,488 @@ class CashFlowCalculator:
         years: int, 
         investment_return: float,
         inflation_rate: float,
-        income_growth: float = 0.03
+        income_growth: float = 0.03,
+        debt_payments: Optional[np.ndarray] = None,
+        resolution: str = 'monthly'
     ) -> pd.DataFrame:
         """
         Calculate wealth over time with various factors.
+
+        debt_payments is an optional monthly outflow array (see
+        DebtCalculator.payment_stream) funded out of savings; once a loan is
+        paid off the freed-up money is invested again. total_contributions is
+        the gross amount saved and total_debt_paid the part of it spent on
+        debt, so investment_gains is wealth less the net amount invested. A
+        payment larger than that month's savings is only funded up to the
+        savings (the rest comes from outside them, never from investments)
+        and a RuntimeWarning is raised.
+
+        resolution='annual' returns only the year-end rows, computed directly
+        from the closed-form intra-year annuity. They equal the month % 12 == 0
+        rows of the monthly projection; use calculate_monthly_detail for the
+        months of a particular span of years.
+        """
+        if resolution == 'annual':
+            return self._annual_projection(years, investment_return, inflation_rate, income_growth, debt_payments)
+        if resolution != 'monthly':
+            raise ValueError(f"Unknown resolution: {resolution}")
+        return self.calculate_monthly_detail(
+            0, years, investment_return, inflation_rate, income_growth, debt_payments
+        )
+
+    def calculate_monthly_detail(
+        self,
+        start_year: int,
+        end_year: int,
+        investment_return: float,
+        inflation_rate: float,
+        income_growth: float = 0.03,
+        debt_payments: Optional[np.ndarray] = None,
+        start_row: Optional[pd.Series] = None
+    ) -> pd.DataFrame:
         """
-        months = years * 12
+        Monthly projection rows for years start_year + 1 through end_year.
+
+        The state at the end of start_year comes from the annual fast path,
+        so only the requested months are stepped through. start_row, that
+        year's row of an annual projection already at hand, avoids
+        recomputing it.
+        """
+        if not 0 <= start_year < end_year:
+            raise ValueError("Need 0 <= start_year < end_year")
+        if start_row is not None and start_row['month'] != start_year * 12:
+            raise ValueError("start_row must be the year-end row of start_year")
+
+        first_month = start_year * 12 + 1
+        months = end_year * 12
+        debt = self._debt_array(debt_payments, months)
         data = {
-            'month': range(1, months + 1),
+            'month': range(first_month, months + 1),
             'nominal_wealth': [],
             'real_wealth': [],
             'total_contributions': [],
+            'total_debt_paid': [],
             'investment_gains': [],
             'income': [],
-            'expenses': []
+            'expenses': [],
+            'debt_payment': []
         }
         
         wealth = 0
         total_contrib = 0
+        total_debt = 0
+        shortfall = False
         current_income = self.income
+        if start_year > 0:
+            year_end = start_row
+            if year_end is None:
+                year_end = self._annual_projection(
+                    start_year, investment_return, inflation_rate, income_growth, debt_payments
+                ).iloc[-1]
+            wealth = year_end['nominal_wealth']
+            total_contrib = year_end['total_contributions']
+            total_debt = year_end['total_debt_paid']
+            current_income = year_end['income']
         
         monthly_return = investment_return / 12
         monthly_inflation = inflation_rate / 12
         monthly_income_growth = income_growth / 12
         
-        for month in range(1, months + 1):
+        for month in range(first_month, months + 1):
             # Update income annually
             if month % 12 == 0:
                 current_income *= (1 + income_growth)
             
             monthly_savings = current_income * self.savings_rate / 12
+            debt_paid = min(debt[month - 1], monthly_savings)
+            shortfall = shortfall or debt[month - 1] > monthly_savings
             
             # Investment growth
-            wealth = wealth * (1 + monthly_return) + monthly_savings
+            wealth = wealth * (1 + monthly_return) + monthly_savings - debt_paid
             total_contrib += monthly_savings
+            total_debt += debt_paid
             
             # Calculate real (inflation-adjusted) wealth
             real_wealth = wealth / ((1 + monthly_inflation) ** month)
-            investment_gains = wealth - total_contrib
+            investment_gains = wealth - (total_contrib - total_debt)
             
             # Store data
             data['nominal_wealth'].append(wealth)
             data['real_wealth'].append(real_wealth)
             data['total_contributions'].append(total_contrib)
+            data['total_debt_paid'].append(total_debt)
             data['investment_gains'].append(investment_gains)
             data['income'].append(current_income)
             data['expenses'].append(self.expenses)
+            data['debt_payment'].append(debt[month - 1])
         
+        if shortfall:
+            CashFlowCalculator._warn_debt_shortfall()
         return pd.DataFrame(data)
-    
+
+    @staticmethod
+    def _warn_debt_shortfall():
+        warnings.warn(
+            "Debt payments exceed savings in some months; the excess is assumed "
+            "to be paid from outside savings, not from investments",
+            RuntimeWarning
+        )
+
+    @staticmethod
+    def _intra_year_factors(monthly_return) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Year-end growth factor and year-end value of 1 saved in each of months 1-11.
+
+        The latter is the closed-form annuity (1 + r) * ((1 + r)^11 - 1) / r.
+        """
+        monthly_return = np.asarray(monthly_return, dtype=float)
+        safe_return = np.where(monthly_return == 0, 1.0, monthly_return)
+        annuity = np.where(
+            monthly_return == 0,
+            11.0,
+            (1 + monthly_return) * np.expm1(11 * np.log1p(safe_return)) / safe_return
+        )
+        return (1 + monthly_return) ** 12, annuity
+
+    @staticmethod
+    def _debt_year_end_value(debt: np.ndarray, monthly_return) -> np.ndarray:
+        """Year-end value of each year's debt payments, shape (..., years)."""
+        by_year = debt.reshape(debt.shape[:-1] + (-1, 12))
+        weights = (1 + np.asarray(monthly_return, dtype=float)[..., None]) ** np.arange(11, -1, -1)
+        return np.einsum('...yj,...j->...y', by_year, weights)
+
+    def _annual_projection(
+        self,
+        years: int,
+        investment_return: float,
+        inflation_rate: float,
+        income_growth: float,
+        debt_payments: Optional[np.ndarray]
+    ) -> pd.DataFrame:
+        monthly_return = investment_return / 12
+        growth, annuity = self._intra_year_factors(monthly_return)
+        debt = self._debt_array(debt_payments, years * 12)
+        
+        # Income is raised in the last month of each year, so months 1-11
+        # save at last year's income and month 12 at the new income
+        year = np.arange(1, years + 1)
+        income_before = self.income * (1 + income_growth) ** (year - 1)
+        income_after = self.income * (1 + income_growth) ** year
+        savings_before = income_before * self.savings_rate / 12
+        savings_after = income_after * self.savings_rate / 12
+        
+        # Debt is paid out of each month's savings, at most all of them
+        savings = np.column_stack([np.repeat(savings_before[:, None], 11, axis=1), savings_after])
+        by_month = debt.reshape(years, 12)
+        if (by_month > savings).any():
+            self._warn_debt_shortfall()
+        debt_paid = np.minimum(by_month, savings)
+        
+        contributions = (
+            savings_before * annuity + savings_after
+            - self._debt_year_end_value(debt_paid.ravel(), monthly_return)
+        )
+        
+        # W_Y = sum_y C_y * G^(Y - y)
+        wealth = growth ** year * np.cumsum(contributions / growth ** year)
+        total_contrib = np.cumsum(11 * savings_before + savings_after)
+        total_debt = np.cumsum(debt_paid.sum(axis=1))
+        month = year * 12
+        
+        return pd.DataFrame({
+            'month': month,
+            'nominal_wealth': wealth,
+            'real_wealth': wealth / (1 + inflation_rate / 12) ** month,
+            'total_contributions': total_contrib,
+            'total_debt_paid': total_debt,
+            'investment_gains': wealth - (total_contrib - total_debt),
+            'income': income_after,
+            'expenses': np.full(years, self.expenses),
+            'debt_payment': debt[month - 1]
+        })
+
+    @staticmethod
+    def _debt_array(debt_payments: Optional[np.ndarray], months: int) -> np.ndarray:
+        """Pad or trim monthly debt payments (last axis) to the projection length."""
+        if debt_payments is None:
+            return np.zeros(months)
+        debt = np.asarray(debt_payments, dtype=float)[..., :months]
+        padding = [(0, 0)] * (debt.ndim - 1) + [(0, months - debt.shape[-1])]
+        return np.pad(debt, padding)
+
+    @staticmethod
+    def calculate_wealth_projection_batch(
+        income,
+        savings_rate,
+        years,
+        investment_return,
+        inflation_rate,
+        income_growth=0.03,
+        debt_payments: Optional[np.ndarray] = None,
+        keep_paths: bool = False,
+        resolution: str = 'monthly',
+        precision: str = 'float64'
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized wealth projection for many parameter sets at once.
+
+        All arguments broadcast to a common 1-D shape and every row follows the
+        same monthly recurrence as calculate_wealth_projection. Values are taken
+        at each row's own horizon; with keep_paths the full (rows, steps) paths
+        are returned instead, rows with shorter horizons holding their final value.
+        debt_payments is a (months,) array shared by every row or (rows, months);
+        as in calculate_wealth_projection it is funded out of savings, at most
+        all of them, and tracked under 'total_debt_paid'.
+        resolution='annual' steps a year at a time using the intra-year annuity,
+        giving the same year-end values with 12x fewer steps.
+
+        precision='float32' halves the memory of the returned paths. Annual
+        runs have few enough steps to stay in plain float32. Monthly runs add
+        up each year's months plainly and carry the yearly wealth, income and
+        contribution recurrences in compensated (double-float) form, so their
+        running state is as large as in float64. A sample of rows is rerun in
+        float64; the largest relative deviation is returned under
+        'max_relative_error' and a warning is raised above FLOAT32_TOLERANCE.
+        """
+        if resolution not in ('monthly', 'annual'):
+            raise ValueError(f"Unknown resolution: {resolution}")
+        dtype = resolve_dtype(precision)
+        # Only the 12x longer monthly recurrence needs compensated float32
+        compensated = dtype is not np.float64 and resolution == 'monthly'
+
+        inputs = (income, savings_rate, years, investment_return, inflation_rate, income_growth)
+        income, savings_rate, years, investment_return, inflation_rate, income_growth = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(x, dtype=float)) for x in inputs)
+        )
+        row_months = years.astype(int) * 12
+        horizon = int(row_months.max()) if row_months.size else 0
+        debt = CashFlowCalculator._debt_array(debt_payments, horizon)
+        has_debt = debt_payments is not None
+        shortfall = False
+
+        monthly_return = investment_return / 12
+        # Discounts are exp(month * log_inflation), computed per step in dtype
+        log_inflation = np.log1p(inflation_rate / 12).astype(dtype)
+
+        if resolution == 'annual':
+            step_months = 12
+            growth, annuity = CashFlowCalculator._intra_year_factors(monthly_return)
+            debt_value = CashFlowCalculator._debt_year_end_value(debt, monthly_return).astype(dtype)
+            by_month = debt.reshape(debt.shape[:-1] + (-1, 12))
+            debt_total = by_month.sum(axis=-1).astype(dtype)
+            annuity = annuity.astype(dtype)
+            if has_debt:
+                # Used to cap a year's payments at its savings where they exceed them
+                debt_peak = by_month.max(axis=-1)
+                month_weights = (1 + monthly_return[..., None]) ** np.arange(11, -1, -1)
+        else:
+            step_months = 1
+            growth = 1 + monthly_return
+        steps = horizon // step_months
+        debt = debt.astype(dtype)
+
+        # Running values and growth factors are tuples: (value,) in float64 and
+        # (hi, lo) pairs in float32 so the low bits are not lost
+        if compensated:
+            def as_state(values):
+                return split(values, dtype)
+
+            def mul_add(state, factor, addend):
+                return compensated_mul_add(*state, *factor, addend)
+
+            def add(state, addend):
+                return compensated_add(*state, addend)
+        else:
+            def as_state(values):
+                return (np.asarray(values, dtype=dtype),)
+
+            def mul_add(state, factor, addend):
+                return (state[0] * factor[0] + addend,)
+
+            def add(state, addend):
+                return (state[0] + addend,)
+
+        if compensated:
+            # float32 error grows with the number of sequential roundings, so
+            # months are accumulated plainly within each year and only the
+            # yearly blocks go through the compensated recurrence
+            year_growth = as_state(growth ** 12)
+            block = np.zeros(income.shape, dtype=dtype)
+            block_contrib = np.zeros(income.shape, dtype=dtype)
+            block_debt = np.zeros(income.shape, dtype=dtype)
+            block_growth = np.ones(income.shape, dtype=dtype)
+        growth = as_state(growth)
+        raise_factor = as_state(1 + income_growth)
+        savings_factor = (savings_rate / 12).astype(dtype)
+
+        wealth = as_state(np.zeros(income.shape))
+        total_contrib = as_state(np.zeros(income.shape))
+        total_debt = as_state(np.zeros(income.shape))
+        current_income = as_state(income)
+
+        def select(active, new, old):
+            return tuple(np.where(active, n, o) for n, o in zip(new, old))
+
+        if keep_paths:
+            wealth_path = np.empty(income.shape + (steps,), dtype=dtype)
+            real_path = np.empty(income.shape + (steps,), dtype=dtype)
+            contrib_path = np.empty(income.shape + (steps,), dtype=dtype)
+            if has_debt:
+                debt_path = np.empty(income.shape + (steps,), dtype=dtype)
+            income_path = np.empty(income.shape + (steps,), dtype=dtype)
+
+        for step in range(1, steps + 1):
+            month = step * step_months
+            active = month <= row_months
+
+            if resolution == 'annual':
+                raised_income = mul_add(current_income, raise_factor, 0)
+                savings_before = current_income[0] * savings_factor
+                savings_after = raised_income[0] * savings_factor
+                year_end_value = savings_before * annuity + savings_after - debt_value[..., step - 1]
+                saved = 11 * savings_before + savings_after
+                debt_paid = np.broadcast_to(debt_total[..., step - 1], income.shape).copy()
+
+                if has_debt:
+                    # Only rows with a payment above some month's savings need the monthly detail
+                    short = np.flatnonzero(
+                        active & (debt_peak[..., step - 1] > np.minimum(savings_before, savings_after))
+                    )
+                    if len(short):
+                        payments = np.broadcast_to(by_month[..., step - 1, :], income.shape + (12,))[short]
+                        savings = np.column_stack([
+                            np.repeat(savings_before[short, None], 11, axis=1), savings_after[short]
+                        ])
+                        shortfall = shortfall or bool((payments > savings).any())
+                        paid = np.minimum(payments, savings)
+                        year_end_value[short] = (
+                            savings_before[short] * annuity[short] + savings_after[short]
+                            - (paid * month_weights[short]).sum(axis=1)
+                        )
+                        debt_paid[short] = paid.sum(axis=1)
+
+                wealth = select(active, mul_add(wealth, growth, year_end_value), wealth)
+                total_contrib = select(active, add(total_contrib, saved), total_contrib)
+                if has_debt:
+                    total_debt = select(active, add(total_debt, debt_paid), total_debt)
+                current_income = select(active, raised_income, current_income)
+            else:
+                if month % 12 == 0:
+                    current_income = select(active, mul_add(current_income, raise_factor, 0), current_income)
+
+                monthly_savings = current_income[0] * savings_factor
+                debt_paid = 0
+                if has_debt:
+                    payment = debt[..., month - 1]
+                    debt_paid = np.minimum(payment, monthly_savings)
+                    shortfall = shortfall or bool(np.any(active & (payment > monthly_savings)))
+                invested = monthly_savings - debt_paid
+
+                if not compensated:
+                    wealth = select(active, mul_add(wealth, growth, invested), wealth)
+                    total_contrib = select(active, add(total_contrib, monthly_savings), total_contrib)
+                    if has_debt:
+                        total_debt = select(active, add(total_debt, debt_paid), total_debt)
+                else:
+                    block = block * growth[0] + invested
+                    block_contrib = block_contrib + monthly_savings
+                    block_debt = block_debt + debt_paid
+                    block_growth = block_growth * growth[0]
+                    if month % 12 == 0:
+                        wealth = select(active, mul_add(wealth, year_growth, block), wealth)
+                        total_contrib = select(active, add(total_contrib, block_contrib), total_contrib)
+                        if has_debt:
+                            total_debt = select(active, add(total_debt, block_debt), total_debt)
+                        block = np.zeros_like(block)
+                        block_contrib = np.zeros_like(block_contrib)
+                        block_debt = np.zeros_like(block_debt)
+                        block_growth = np.ones_like(block_growth)
+
+            if keep_paths:
+                if compensated:
+                    # Mid-year values: the start-of-year balance grown to date plus this year's block
+                    held_wealth = wealth_path[..., step - 2] if step > 1 else 0
+                    held_contrib = contrib_path[..., step - 2] if step > 1 else 0
+                    wealth_path[..., step - 1] = np.where(active, sum(wealth) * block_growth + block, held_wealth)
+                    contrib_path[..., step - 1] = np.where(active, sum(total_contrib) + block_contrib, held_contrib)
+                    if has_debt:
+                        held_debt = debt_path[..., step - 2] if step > 1 else 0
+                        debt_path[..., step - 1] = np.where(active, sum(total_debt) + block_debt, held_debt)
+                else:
+                    wealth_path[..., step - 1] = sum(wealth)
+                    contrib_path[..., step - 1] = sum(total_contrib)
+                    if has_debt:
+                        debt_path[..., step - 1] = sum(total_debt)
+                income_path[..., step - 1] = sum(current_income)
+                held_real = real_path[..., step - 2] if step > 1 else 0
+                real_path[..., step - 1] = np.where(
+                    active, wealth_path[..., step - 1] / np.exp(dtype(month) * log_inflation), held_real
+                )
+
+        if keep_paths:
+            # Gains are built in place to avoid (rows, steps) temporaries
+            gains_path = np.subtract(wealth_path, contrib_path)
+            if has_debt:
+                gains_path += debt_path
+            else:
+                debt_path = np.zeros_like(contrib_path)
+            result = {
+                'nominal_wealth': wealth_path,
+                'real_wealth': real_path,
+                'total_contributions': contrib_path,
+                'total_debt_paid': debt_path,
+                'investment_gains': gains_path,
+                'income': income_path
+            }
+        else:
+            final_wealth = sum(wealth)
+            final_contrib = sum(total_contrib)
+            final_debt = sum(total_debt).astype(dtype)
+            result = {
+                'nominal_wealth': final_wealth,
+                'real_wealth': final_wealth / np.exp(row_months.astype(dtype) * log_inflation),
+                'total_contributions': final_contrib,
+                'total_debt_paid': final_debt,
+                'investment_gains': final_wealth - (final_contrib - final_debt),
+                'income': sum(current_income)
+            }
+
+        if shortfall:
+            CashFlowCalculator._warn_debt_shortfall()
+
+        if dtype is not np.float64:
+            rows = np.unique(np.linspace(0, len(income) - 1, min(len(income), ACCURACY_SAMPLE_SIZE)).astype(int))
+            sample_debt = None
+            if debt_payments is not None:
+                sample_debt = np.asarray(debt_payments, dtype=float)
+                if sample_debt.ndim > 1:
+                    sample_debt = sample_debt[rows]
+            reference = CashFlowCalculator.calculate_wealth_projection_batch(
+                *(x[rows] for x in (income, savings_rate, years, investment_return, inflation_rate, income_growth)),
+                debt_payments=sample_debt,
+                keep_paths=keep_paths,
+                resolution=resolution
+            )
+            sample = {key: result[key][rows] for key in reference}
+
+            # Gross savings to date set the scale of each value, so balances
+            # largely spent on debt are not judged against a near-zero wealth
+            scale = np.maximum(np.abs(reference['total_contributions']), 1.0)
+
+            # investment_gains is a difference of checked columns and can sit near zero
+            error = max_relative_error(
+                sample, reference,
+                ('nominal_wealth', 'real_wealth', 'total_contributions', 'total_debt_paid', 'income'), scale
+            )
+            result['max_relative_error'] = error
+            if error > FLOAT32_TOLERANCE:
+                warnings.warn(
+                    f"float32 projection deviates from float64 by up to {error:.2e} (relative)",
+                    RuntimeWarning
+                )
+
+        return result
+
     def calculate_fire_number(self, annual_expenses: float, withdrawal_rate: float = 0.04) -> float:
         """Calculate Financial Independence, Retire Early (FIRE) number."""
         return annual_expenses / withdrawal_rate
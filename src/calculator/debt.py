@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+
+def _annuity_factor(monthly_rate, periods):
+    """Future value of 1 paid at the end of each period: ((1 + r)^n - 1) / r."""
+    monthly_rate = np.asarray(monthly_rate, dtype=float)
+    periods = np.asarray(periods, dtype=float)
+    safe_rate = np.where(monthly_rate == 0, 1.0, monthly_rate)
+    return np.where(
+        monthly_rate == 0,
+        periods,
+        ((1 + monthly_rate) ** periods - 1) / safe_rate
+    )
+
+
+class DebtCalculator:
+    @staticmethod
+    def monthly_payment(principal, annual_rate, term_months):
+        """Level payment that amortizes principal over term_months."""
+        principal = np.asarray(principal, dtype=float)
+        r = np.asarray(annual_rate, dtype=float) / 12
+        n = np.asarray(term_months, dtype=float)
+        safe_rate = np.where(r == 0, 1.0, r)
+        payment = np.where(r == 0, principal / n, principal * safe_rate / (1 - (1 + safe_rate) ** -n))
+        return payment if payment.ndim else float(payment)
+
+    @staticmethod
+    def amortization_schedule(
+        principal: float,
+        annual_rate: float,
+        term_months: int,
+        extra_payment: float = 0,
+        lump_sums: Optional[Dict[int, float]] = None,
+        rate_changes: Optional[Dict[int, float]] = None
+    ) -> pd.DataFrame:
+        """
+        Month-by-month loan schedule with optional prepayments and rate resets.
+
+        lump_sums maps a month to a prepayment made after that month's payment;
+        month 0 is an upfront prepayment, recorded as a month-0 row, that
+        lowers the balance but keeps the payment of the full principal.
+        rate_changes maps a month to the annual rate charged from that month on;
+        the payment is re-amortized over the remaining term at each reset, as
+        on a variable-rate loan. Between events the balance follows the closed
+        form B_k = B_0 (1 + r)^k - payment * ((1 + r)^k - 1) / r.
+        """
+        lump_sums = lump_sums or {}
+        rate_changes = rate_changes or {}
+
+        # Split the term into segments at every rate change and prepayment
+        boundaries = {1, term_months + 1}
+        boundaries.update(m for m in rate_changes if 1 <= m <= term_months)
+        boundaries.update(m + 1 for m in lump_sums if 1 <= m < term_months)
+        boundaries = sorted(boundaries)
+
+        balance = float(principal)
+        rate = annual_rate
+        payment = DebtCalculator.monthly_payment(principal, annual_rate, term_months)
+        segments = []
+
+        upfront = min(lump_sums.get(0, 0), balance)
+        if upfront > 0:
+            balance -= upfront
+            segments.append(pd.DataFrame({
+                'month': [0],
+                'payment': [0.0],
+                'interest': [0.0],
+                'principal': [0.0],
+                'prepayment': [upfront],
+                'balance': [balance]
+            }))
+            if balance <= 0:
+                return pd.concat(segments, ignore_index=True)
+
+        for start, end in zip(boundaries[:-1], boundaries[1:]):
+            if start in rate_changes:
+                rate = rate_changes[start]
+                payment = DebtCalculator.monthly_payment(balance, rate, term_months - start + 1)
+
+            monthly_rate = rate / 12
+            k = np.arange(1, end - start + 1)
+            paid = np.full(len(k), payment + extra_payment)
+            closing = balance * (1 + monthly_rate) ** k - paid * _annuity_factor(monthly_rate, k)
+            opening = np.concatenate(([balance], closing[:-1]))
+
+            # Final payment clears whatever is left, whether the loan ends early or at term
+            paid_off = np.flatnonzero(closing <= 1e-9)
+            if len(paid_off):
+                last = paid_off[0]
+                k, paid, closing, opening = k[:last + 1], paid[:last + 1], closing[:last + 1], opening[:last + 1]
+            elif end == term_months + 1:
+                last = len(k) - 1
+            else:
+                last = None
+            if last is not None:
+                paid[last] = opening[last] * (1 + monthly_rate)
+                closing[last] = 0.0
+
+            interest = opening * monthly_rate
+            prepayment = np.zeros(len(k))
+            month_end = start + len(k) - 1
+            if month_end in lump_sums and closing[-1] > 0:
+                prepayment[-1] = min(lump_sums[month_end], closing[-1])
+                closing[-1] -= prepayment[-1]
+
+            segments.append(pd.DataFrame({
+                'month': start + k - 1,
+                'payment': paid,
+                'interest': interest,
+                'principal': paid - interest,
+                'prepayment': prepayment,
+                'balance': closing
+            }))
+
+            balance = closing[-1]
+            if balance <= 0:
+                break
+
+        return pd.concat(segments, ignore_index=True)
+
+    @staticmethod
+    def payment_stream(schedule: pd.DataFrame, months: int, start_month: int = 1) -> np.ndarray:
+        """
+        Spread a schedule's payments and prepayments over a monthly cash-flow array.
+
+        start_month is the projection month in which the loan's first payment falls.
+        """
+        stream = np.zeros(months)
+        index = schedule['month'].to_numpy() + start_month - 2
+        in_range = (index >= 0) & (index < months)
+        outflow = (schedule['payment'] + schedule['prepayment']).to_numpy()
+        np.add.at(stream, index[in_range], outflow[in_range])
+        return stream
+
+    @staticmethod
+    def compare_prepayment_strategies(
+        principal: float,
+        annual_rate: float,
+        term_months: int,
+        extra_payments,
+        investment_return: float,
+        lump_sums=0
+    ) -> pd.DataFrame:
+        """
+        Compare paying down a fixed-rate loan against investing the same money.
+
+        Each strategy is an extra monthly payment plus an upfront lump sum,
+        broadcast against each other; both must be non-negative. The lump sum
+        matches lump_sums={0: lump_sum} in amortization_schedule. Prepaying puts the money into the loan
+        and invests the whole freed-up payment once it is cleared; investing
+        keeps the scheduled payment and invests the extra money instead. Both
+        are valued at the original term, in closed form for all strategies at once.
+        """
+        extra, lump = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(extra_payments, dtype=float)),
+            np.atleast_1d(np.asarray(lump_sums, dtype=float))
+        )
+        if (extra < 0).any() or (lump < 0).any():
+            raise ValueError("extra_payments and lump_sums must be non-negative")
+        lump = np.minimum(lump, principal)
+
+        r = annual_rate / 12
+        q = investment_return / 12
+        growth = 1 + r
+        scheduled = DebtCalculator.monthly_payment(principal, annual_rate, term_months)
+        base_interest = scheduled * term_months - principal
+
+        balance = principal - lump
+        outlay = scheduled + extra
+
+        # Months to payoff: first k where balance * g^k <= outlay * ((g^k - 1) / r)
+        if r == 0:
+            payoff = np.ceil(balance / outlay - 1e-12)
+        else:
+            payoff = np.ceil(np.log(outlay / (outlay - r * balance)) / np.log(growth) - 1e-9)
+        payoff = np.clip(payoff, 0, term_months)
+
+        before_last = np.maximum(payoff - 1, 0)
+        balance_before_last = balance * growth ** before_last - outlay * _annuity_factor(r, before_last)
+        last_payment = np.where(payoff > 0, balance_before_last * growth, 0.0)
+        total_interest = outlay * before_last + last_payment - balance
+
+        remaining = term_months - payoff
+        leftover = np.where(payoff > 0, outlay - last_payment, 0.0)
+        prepay_wealth = leftover * (1 + q) ** remaining + outlay * _annuity_factor(q, remaining)
+        invest_wealth = lump * (1 + q) ** term_months + extra * _annuity_factor(q, term_months)
+
+        return pd.DataFrame({
+            'extra_payment': extra,
+            'lump_sum': lump,
+            'payoff_month': payoff.astype(int),
+            'total_interest': total_interest,
+            'interest_saved': base_interest - total_interest,
+            'prepay_wealth': prepay_wealth,
+            'invest_wealth': invest_wealth,
+            'prepay_advantage': prepay_wealth - invest_wealth
+        })
@@ -0,0 +1,247 @@
+import warnings
+
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+from src.calculator.cash_flow import CashFlowCalculator
+from src.calculator.investment import InvestmentAnalyzer
+from src.calculator.precision import (
+    ACCURACY_SAMPLE_SIZE, FLOAT32_TOLERANCE, compensated_mul_add, max_relative_error, resolve_dtype
+)
+
+
+class MonteCarloSimulator:
+    """
+    Stochastic wealth projections for a CashFlowCalculator profile.
+
+    Monthly returns are normal with mean investment_return / 12 and standard
+    deviation volatility / sqrt(12); contributions follow the calculator's
+    deterministic savings and income growth.
+    """
+
+    METHODS = ('pseudo', 'antithetic', 'sobol')
+
+    def __init__(
+        self,
+        calculator: CashFlowCalculator,
+        years: int,
+        investment_return: float,
+        volatility: float,
+        inflation_rate: float,
+        income_growth: float = 0.03,
+        seed: Optional[int] = None
+    ):
+        self.calculator = calculator
+        self.years = years
+        self.investment_return = investment_return
+        self.volatility = volatility
+        self.inflation_rate = inflation_rate
+        self.months = years * 12
+        self.rng = np.random.default_rng(seed)
+
+        month = np.arange(1, self.months + 1)
+        self.contributions = calculator.income * (1 + income_growth) ** (month // 12) * calculator.savings_rate / 12
+
+        # Constant contributions under the same returns have a known mean:
+        # E[prod(1 + r_k)] = (1 + mu / 12)^k because the monthly returns are independent
+        if investment_return == 0:
+            self.control_mean = calculator.monthly_savings * self.months
+        else:
+            self.control_mean = InvestmentAnalyzer.compound_interest(
+                0, investment_return, years, calculator.monthly_savings, 12
+            )
+
+    def _normals(self, n: int, method: str, dtype=np.float64) -> np.ndarray:
+        """Standard normal draws laid out (months, paths) so each month is contiguous."""
+        if method == 'pseudo':
+            return self.rng.standard_normal((self.months, n), dtype=dtype)
+        if method == 'antithetic':
+            # Paths i and i + n / 2 form a mirrored pair
+            z = self.rng.standard_normal((self.months, n // 2), dtype=dtype)
+            return np.concatenate([z, -z], axis=1)
+
+        from scipy.special import ndtri
+        from scipy.stats import qmc
+
+        sobol = qmc.Sobol(d=self.months, scramble=True, seed=self.rng)
+        u = sobol.random(n)
+        return np.ascontiguousarray(ndtri(np.clip(u, 1e-12, 1 - 1e-12)).T, dtype=dtype)
+
+    def _simulate(self, z: np.ndarray):
+        """Final real wealth and the constant-contribution control for each path."""
+        dtype = z.dtype.type
+        # NumPy scalars are cast too, otherwise float64 constants promote z
+        returns = dtype(self.investment_return / 12) + dtype(self.volatility / np.sqrt(12)) * z
+        contributions = self.contributions.astype(dtype)
+        monthly_savings = dtype(self.calculator.monthly_savings)
+
+        n = z.shape[1]
+        if dtype is np.float64:
+            wealth = np.zeros(n)
+            control = np.zeros(n)
+            for month in range(self.months):
+                growth = 1 + returns[month]
+                wealth = wealth * growth + contributions[month]
+                control = control * growth + monthly_savings
+        else:
+            # As in calculate_wealth_projection_batch: plain float32 within each
+            # year, compensated (hi, lo) accumulation of the yearly blocks
+            zeros = np.zeros(n, dtype=dtype)
+            wealth_pair, control_pair = (zeros, zeros), (zeros, zeros)
+            block, control_block, block_growth = zeros, zeros, np.ones(n, dtype=dtype)
+            for month in range(self.months):
+                growth = 1 + returns[month]
+                block = block * growth + contributions[month]
+                control_block = control_block * growth + monthly_savings
+                block_growth = block_growth * growth
+                if (month + 1) % 12 == 0:
+                    wealth_pair = compensated_mul_add(*wealth_pair, block_growth, 0, block)
+                    control_pair = compensated_mul_add(*control_pair, block_growth, 0, control_block)
+                    block, control_block, block_growth = zeros, zeros, np.ones(n, dtype=dtype)
+            wealth = wealth_pair[0] + wealth_pair[1]
+            control = control_pair[0] + control_pair[1]
+
+        real_wealth = wealth / dtype((1 + self.inflation_rate / 12) ** self.months)
+        return real_wealth, control
+
+    @staticmethod
+    def _units(values: np.ndarray, method: str) -> np.ndarray:
+        """Collapse one batch of path values into independent, identically distributed units."""
+        if method == 'pseudo':
+            return values
+        if method == 'antithetic':
+            half = len(values) // 2
+            return (values[:half] + values[half:]) / 2
+        # Each scrambled Sobol batch is one independent replicate
+        return values.mean(keepdims=True)
+
+    @staticmethod
+    def _estimate(units: np.ndarray, control_units: np.ndarray, control_mean: float, beta: float):
+        units = units - beta * (control_units - control_mean)
+        if len(units) < 2:
+            return units.mean(), np.nan
+        return units.mean(), units.std(ddof=1) / np.sqrt(len(units))
+
+    def run(
+        self,
+        n_paths: int = 10000,
+        method: str = 'pseudo',
+        control_variate: bool = False,
+        fire_number: Optional[float] = None,
+        tolerance: Optional[float] = None,
+        max_paths: int = 1_000_000,
+        batch_size: int = 4096,
+        percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+        precision: str = 'float64'
+    ) -> Dict:
+        """
+        Simulate final real wealth and the FIRE success probability.
+
+        method selects plain pseudo-random draws, antithetic pairs or
+        scrambled Sobol points. Each Sobol batch is an independent
+        randomization and one replicate of the estimate, so every batch has
+        the same power-of-two size (batch_size rounded down) and the path
+        count is rounded up to whole batches. control_variate adjusts the
+        estimates using the closed-form compound_interest mean. Without a
+        tolerance n_paths paths are run, rounded up to whole pairs for
+        antithetic sampling and to whole batches for Sobol; with one,
+        batches continue until the standard error of the mean is within
+        tolerance * |mean| or max_paths is reached.
+
+        precision='float32' halves the memory of the path matrices. A sample
+        of the first batch is rerun in float64 from the same draws and the
+        largest relative deviation is reported as 'max_relative_error'.
+        Percentiles are returned in the dtype the paths were simulated in.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method: {method}")
+        dtype = resolve_dtype(precision)
+        if fire_number is None:
+            fire_number = self.calculator.calculate_fire_number(self.calculator.expenses)
+
+        limit = n_paths if tolerance is None else max_paths
+        if method == 'sobol':
+            # At least two replicates are needed for a standard error
+            batch_size = min(2 ** int(np.log2(batch_size)), max(2, 2 ** int(np.log2(max(limit // 2, 2)))))
+
+        batches = []
+        simulated = 0
+        converged = False
+        accuracy = {}
+
+        while simulated < limit:
+            n = min(batch_size, limit - simulated)
+            if method == 'antithetic':
+                n += n % 2
+            elif method == 'sobol':
+                # Replicates of unequal size would not be identically distributed
+                n = batch_size
+
+            z = self._normals(n, method, dtype)
+            wealth, control = self._simulate(z)
+            simulated += n
+
+            if dtype is not np.float64 and not accuracy:
+                rows = np.unique(np.linspace(0, n - 1, min(n, ACCURACY_SAMPLE_SIZE)).astype(int))
+                ref_wealth, ref_control = self._simulate(z[:, rows].astype(np.float64))
+                error = max_relative_error(
+                    {'real_wealth': wealth[rows], 'control': control[rows]},
+                    {'real_wealth': ref_wealth, 'control': ref_control},
+                    ('real_wealth', 'control')
+                )
+                accuracy['max_relative_error'] = error
+                if error > FLOAT32_TOLERANCE:
+                    warnings.warn(
+                        f"float32 simulation deviates from float64 by up to {error:.2e} (relative)",
+                        RuntimeWarning
+                    )
+            batches.append((wealth, (wealth >= fire_number).astype(float), control))
+
+            if tolerance is not None:
+                estimates = self._summarize(batches, method, control_variate)
+                if estimates['std_error'] <= tolerance * abs(estimates['mean_final_wealth']):
+                    converged = True
+                    break
+
+        all_wealth = np.concatenate([wealth for wealth, _, _ in batches])
+
+        return {
+            'method': method,
+            'n_paths': simulated,
+            **self._summarize(batches, method, control_variate),
+            'percentiles': dict(zip(percentiles, np.percentile(all_wealth, percentiles).astype(all_wealth.dtype))),
+            'fire_number': fire_number,
+            'converged': converged,
+            **accuracy
+        }
+
+    def _summarize(self, batches, method: str, control_variate: bool) -> Dict[str, float]:
+        wealth, success, control = (np.concatenate(paths).astype(np.float64) for paths in zip(*batches))
+        wealth_units, success_units, control_units = (
+            np.concatenate([self._units(paths.astype(np.float64), method) for paths in batch_paths])
+            for batch_paths in zip(*batches)
+        )
+
+        wealth_beta = success_beta = 0.0
+        if control_variate:
+            # The coefficients should come from the averaged units, but a handful
+            # of Sobol replicates is too few for that, so fall back to the paths
+            if len(control_units) < 30:
+                wealth_units_fit, success_units_fit, control_fit = wealth, success, control
+            else:
+                wealth_units_fit, success_units_fit, control_fit = wealth_units, success_units, control_units
+            control_var = control_fit.var(ddof=1)
+            if control_var > 0:
+                wealth_beta = np.cov(wealth_units_fit, control_fit)[0, 1] / control_var
+                success_beta = np.cov(success_units_fit, control_fit)[0, 1] / control_var
+
+        mean, std_error = self._estimate(wealth_units, control_units, self.control_mean, wealth_beta)
+        probability, probability_error = self._estimate(success_units, control_units, self.control_mean, success_beta)
+
+        return {
+            'mean_final_wealth': mean,
+            'std_error': std_error,
+            'fire_probability': probability,
+            'fire_probability_std_error': probability_error,
+            'control_variate_beta': wealth_beta if control_variate else None
+        }
@@ -0,0 +1,92 @@
+import numpy as np
+from typing import Dict, Iterable, Tuple
+
+# float32 runs are checked against a float64 rerun of this many rows
+ACCURACY_SAMPLE_SIZE = 256
+
+# Largest acceptable relative error of a float32 run before warning
+FLOAT32_TOLERANCE = 1e-5
+
+PRECISIONS = {'float64': np.float64, 'float32': np.float32}
+
+
+def resolve_dtype(precision: str):
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision}")
+    return PRECISIONS[precision]
+
+
+def split(values, dtype) -> Tuple[np.ndarray, np.ndarray]:
+    """Represent float64 values as a (hi, lo) pair of dtype values."""
+    values = np.asarray(values, dtype=np.float64)
+    hi = values.astype(dtype)
+    lo = (values - hi).astype(dtype)
+    return hi, lo
+
+
+def two_sum(a, b):
+    """a + b as a rounded sum and its exact rounding error (Knuth)."""
+    s = a + b
+    b_virtual = s - a
+    error = (a - (s - b_virtual)) + (b - b_virtual)
+    return s, error
+
+
+def _split_float(a):
+    # Veltkamp splitting of a float32 into two 12-bit halves
+    c = a * np.float32(4097)
+    hi = c - (c - a)
+    return hi, a - hi
+
+
+def two_prod(a, b):
+    """a * b as a rounded product and its exact rounding error (Dekker)."""
+    p = a * b
+    a_hi, a_lo = _split_float(a)
+    b_hi, b_lo = _split_float(b)
+    error = ((a_hi * b_hi - p) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
+    return p, error
+
+
+def compensated_mul_add(hi, lo, factor_hi, factor_lo, addend):
+    """
+    (hi + lo) * (factor_hi + factor_lo) + addend in double-float arithmetic.
+
+    Carrying the rounding errors in lo keeps long float32 recurrences such as
+    the monthly wealth update close to float64 accuracy.
+    """
+    p, product_error = two_prod(hi, factor_hi)
+    s, sum_error = two_sum(p, addend)
+    lo = lo * factor_hi + hi * factor_lo + product_error + sum_error
+    hi = s + lo
+    return hi, lo - (hi - s)
+
+
+def compensated_add(hi, lo, addend):
+    """Kahan-style running sum (hi + lo) + addend."""
+    s, error = two_sum(hi, addend)
+    lo = lo + error
+    hi = s + lo
+    return hi, lo - (hi - s)
+
+
+def max_relative_error(
+    values: Dict[str, np.ndarray],
+    reference: Dict[str, np.ndarray],
+    keys: Iterable[str],
+    scale=1.0
+) -> float:
+    """
+    Largest relative difference from a float64 reference.
+
+    Differences are measured against the larger of the reference value and
+    scale, so balances that net out near zero (savings largely spent on debt
+    payments) are judged against the money that flowed through them.
+    """
+    worst = 0.0
+    for key in keys:
+        ref = np.asarray(reference[key], dtype=np.float64)
+        diff = np.abs(np.asarray(values[key], dtype=np.float64) - ref)
+        if diff.size:
+            worst = max(worst, float(np.max(diff / np.maximum(np.abs(ref), scale))))
+    return worst
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+from src.calculator.cash_flow import CashFlowCalculator
+
+
+class SensitivityAnalyzer:
+    """Partial effects and tornado ranges for the wealth projection inputs."""
+
+    PARAMETERS = ('investment_return', 'inflation_rate', 'savings_rate', 'income_growth', 'years')
+
+    # Finite-difference steps used for the partial effects
+    DEFAULT_STEPS = {
+        'investment_return': 0.0001,
+        'inflation_rate': 0.0001,
+        'savings_rate': 0.0001,
+        'income_growth': 0.0001,
+        'years': 1
+    }
+
+    # Low/high swings used for the tornado ranges
+    DEFAULT_SWINGS = {
+        'investment_return': 0.02,
+        'inflation_rate': 0.01,
+        'savings_rate': 0.05,
+        'income_growth': 0.01,
+        'years': 5
+    }
+
+    BOUNDS = {
+        'savings_rate': (0.0, 1.0),
+        'years': (1, None)
+    }
+
+    def __init__(
+        self,
+        calculator: CashFlowCalculator,
+        years: int,
+        investment_return: float,
+        inflation_rate: float,
+        income_growth: float = 0.03
+    ):
+        self.calculator = calculator
+        self.base = {
+            'investment_return': investment_return,
+            'inflation_rate': inflation_rate,
+            'savings_rate': calculator.savings_rate,
+            'income_growth': income_growth,
+            'years': years
+        }
+
+    def _shifted(self, parameter: str, delta: float) -> float:
+        value = self.base[parameter] + delta
+        low, high = self.BOUNDS.get(parameter, (None, None))
+        if low is not None:
+            value = max(value, low)
+        if high is not None:
+            value = min(value, high)
+        return value
+
+    def analyze(
+        self,
+        metric: str = 'real_wealth',
+        steps: Optional[Dict[str, float]] = None,
+        swings: Optional[Dict[str, float]] = None
+    ) -> pd.DataFrame:
+        """
+        Compute partial effects and tornado ranges for every parameter.
+
+        The base profile plus the two finite-difference and two tornado
+        profiles of each parameter are evaluated in a single batched
+        projection. Rows are sorted by swing, largest first.
+        """
+        steps = {**self.DEFAULT_STEPS, **(steps or {})}
+        swings = {**self.DEFAULT_SWINGS, **(swings or {})}
+
+        # Row 0 is the base profile, then (step low, step high, swing low, swing high) per parameter
+        profiles = [dict(self.base)]
+        for parameter in self.PARAMETERS:
+            for delta in (-steps[parameter], steps[parameter], -swings[parameter], swings[parameter]):
+                profile = dict(self.base)
+                profile[parameter] = self._shifted(parameter, delta)
+                profiles.append(profile)
+
+        columns = {name: np.array([p[name] for p in profiles]) for name in self.PARAMETERS}
+        outcome = CashFlowCalculator.calculate_wealth_projection_batch(
+            self.calculator.income,
+            columns['savings_rate'],
+            columns['years'],
+            columns['investment_return'],
+            columns['inflation_rate'],
+            columns['income_growth'],
+            resolution='annual'
+        )[metric]
+
+        base_outcome = outcome[0]
+        results = []
+        for i, parameter in enumerate(self.PARAMETERS):
+            row = 1 + 4 * i
+            step_low, step_high, swing_low, swing_high = (columns[parameter][row + k] for k in range(4))
+            f_step_low, f_step_high, f_swing_low, f_swing_high = outcome[row:row + 4]
+
+            span = step_high - step_low
+            partial = (f_step_high - f_step_low) / span if span else 0.0
+            base_value = self.base[parameter]
+
+            results.append({
+                'parameter': parameter,
+                'base_value': base_value,
+                'low_value': swing_low,
+                'high_value': swing_high,
+                'low_outcome': f_swing_low,
+                'high_outcome': f_swing_high,
+                'swing': abs(f_swing_high - f_swing_low),
+                'partial_effect': partial,
+                'elasticity': partial * base_value / base_outcome if base_outcome else 0.0
+            })
+
+        df = pd.DataFrame(results).sort_values('swing', ascending=False).reset_index(drop=True)
+        df.attrs['base_outcome'] = base_outcome
+        df.attrs['metric'] = metric
+        return df
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from config.settings import CACHE_DIR, CACHE_MAX_BYTES, ENGINE_VERSION
+
+
+class ResultCache:
+    """
+    Disk-backed simulation result cache shared by every session and process.
+
+    Results live in a sqlite database under cache_dir, keyed by a hash of the
+    canonical simulation parameters and the engine version. Once the stored
+    results exceed max_bytes the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = CACHE_DIR,
+        max_bytes: int = CACHE_MAX_BYTES,
+        engine_version: str = ENGINE_VERSION
+    ):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'results.sqlite')
+        self.max_bytes = max_bytes
+        self.engine_version = engine_version
+        self._local = threading.local()
+
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+            'size INTEGER NOT NULL, last_access REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_last_access ON results (last_access)')
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite connections must not be shared across threads, so keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @classmethod
+    def _canonical(cls, value: Any) -> Any:
+        """Normalise parameters so equal scenarios hash equally (30, 30.0 and np.int64(30) alike)."""
+        if isinstance(value, (np.generic, np.ndarray)):
+            value = value.tolist()
+        if isinstance(value, dict):
+            return {str(k): cls._canonical(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [cls._canonical(v) for v in value]
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        raise TypeError(f"Unsupported parameter type: {type(value).__name__}")
+
+    def make_key(self, namespace: str, params: Dict[str, Any]) -> str:
+        """Hash the namespace, engine version and parameters into a cache key."""
+        payload = json.dumps(
+            {'namespace': namespace, 'engine_version': self.engine_version, 'params': self._canonical(params)},
+            sort_keys=True,
+            separators=(',', ':')
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for key, or None on a miss."""
+        conn = self._connect()
+        row = conn.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+
+        try:
+            value = pickle.loads(row[0])
+        except Exception:
+            # Unreadable entry (e.g. written by an incompatible library version)
+            conn.execute('DELETE FROM results WHERE key = ?', (key,))
+            return None
+
+        try:
+            conn.execute('UPDATE results SET last_access = ? WHERE key = ?', (time.time(), key))
+        except sqlite3.OperationalError:
+            # Another writer holds the lock; a stale access time only affects eviction order
+            pass
+        return value
+
+    def set(self, key: str, value: Any):
+        """Store a result and evict least recently used entries over the size bound."""
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO results (key, value, size, last_access) VALUES (?, ?, ?, ?)',
+                (key, blob, len(blob), time.time())
+            )
+            self._evict(conn)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        stale = []
+        for key, size in conn.execute('SELECT key, size FROM results ORDER BY last_access'):
+            if excess <= 0:
+                break
+            stale.append((key,))
+            excess -= size
+        conn.executemany('DELETE FROM results WHERE key = ?', stale)
+
+    def get_or_compute(self, namespace: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """Return the cached result for params, computing and storing it on a miss."""
+        key = self.make_key(namespace, params)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        """Remove every cached result."""
+        self._connect().execute('DELETE FROM results')
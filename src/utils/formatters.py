@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from typing import Union
+
+
+def format_currency(value: Union[float, np.ndarray, pd.Series], decimals: int = 0):
+    """Format a value, or every value in an array, as dollars."""
+    template = f"${{:,.{decimals}f}}"
+    if np.ndim(value) == 0:
+        return template.format(value)
+    return pd.Series(value).map(template.format)
+
+
+def format_percent(value: Union[float, np.ndarray, pd.Series], decimals: int = 1):
+    """Format a fraction (0.07), or every fraction in an array, as a percentage."""
+    template = f"{{:.{decimals}%}}"
+    if np.ndim(value) == 0:
+        return template.format(value)
+    return pd.Series(value).map(template.format)
+
+
+def format_scenarios(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a display copy of a scenario table with formatted numbers."""
+    display = df.copy()
+    for column in ('income', 'expenses'):
+        if column in display:
+            display[column] = format_currency(display[column]).to_numpy()
+    for column in ('savings_rate', 'investment_return', 'inflation_rate', 'income_growth'):
+        if column in display:
+            display[column] = format_percent(display[column]).to_numpy()
+    return display
@@ -0,0 +1,37 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+from src.utils.validators import validate_scenarios
+
+# Columns passed straight through to CashFlowCalculator.calculate_wealth_projection_batch
+BATCH_COLUMNS = ('income', 'savings_rate', 'years', 'investment_return', 'inflation_rate', 'income_growth')
+
+
+def load_scenarios(path: str) -> pd.DataFrame:
+    """
+    Load and validate a scenario library.
+
+    JSON files hold either a list of scenario records under "scenarios" or,
+    for large libraries, one array per field under "columns". CSV files are
+    read with one scenario per row.
+    """
+    if os.path.splitext(path)[1].lower() == '.csv':
+        return validate_scenarios(pd.read_csv(path))
+
+    with open(path) as f:
+        library = json.load(f)
+
+    if 'columns' in library:
+        df = pd.DataFrame(library['columns'])
+    else:
+        df = pd.DataFrame.from_records(library.get('scenarios', []))
+
+    return validate_scenarios(df)
+
+
+def compile_scenarios(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Convert a validated scenario table into columnar batch parameter arrays."""
+    return {column: df[column].to_numpy() for column in BATCH_COLUMNS}
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from typing import List
+
+# Column schema for scenario libraries. Columns with a default are optional.
+SCENARIO_SCHEMA = {
+    'income': {'min': 0, 'max': 1e9},
+    'expenses': {'min': 0, 'max': 1e9, 'default': 0.0},
+    'savings_rate': {'min': 0, 'max': 1},
+    'years': {'min': 1, 'max': 100, 'integer': True},
+    'investment_return': {'min': -0.5, 'max': 0.5},
+    'inflation_rate': {'min': -0.1, 'max': 0.5},
+    'income_growth': {'min': -0.5, 'max': 0.5, 'default': 0.03},
+}
+
+
+class ScenarioValidationError(ValueError):
+    """Raised when a scenario table fails schema validation."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("Invalid scenarios:\n" + "\n".join(errors))
+
+
+def _describe(column: str, problem: str, mask: np.ndarray, max_rows: int = 5) -> str:
+    rows = np.flatnonzero(mask)
+    shown = ', '.join(str(r) for r in rows[:max_rows])
+    more = f" and {len(rows) - max_rows} more" if len(rows) > max_rows else ""
+    return f"{column}: {problem} in {len(rows)} row(s) (rows {shown}{more})"
+
+
+def validate_scenarios(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Validate a scenario table against SCENARIO_SCHEMA.
+
+    Checks run column-wise over the whole table, so large libraries are
+    validated in bulk. Optional columns are filled with their defaults and
+    a 'name' column is generated when missing; names must be unique. Raises ScenarioValidationError
+    listing every failing column.
+    """
+    errors = []
+    result = pd.DataFrame(index=pd.RangeIndex(len(df)))
+
+    if 'name' in df.columns:
+        result['name'] = df['name'].astype(str).to_numpy()
+    else:
+        result['name'] = 'Scenario ' + pd.Series(np.arange(1, len(df) + 1)).astype(str)
+
+    # Names identify presets in the app, so they must be unique
+    duplicated = result['name'].duplicated(keep=False).to_numpy()
+    if duplicated.any():
+        errors.append(_describe('name', "duplicate name", duplicated))
+
+    for column, rules in SCENARIO_SCHEMA.items():
+        if column not in df.columns:
+            if 'default' in rules:
+                result[column] = np.full(len(df), rules['default'])
+            else:
+                errors.append(f"{column}: required column is missing")
+            continue
+
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+        missing = np.isnan(values)
+        if missing.any():
+            if 'default' in rules:
+                values[missing] = rules['default']
+            else:
+                errors.append(_describe(column, "missing or non-numeric value", missing))
+                continue
+
+        out_of_range = (values < rules['min']) | (values > rules['max'])
+        if out_of_range.any():
+            errors.append(_describe(column, f"value outside [{rules['min']}, {rules['max']}]", out_of_range))
+
+        if rules.get('integer'):
+            fractional = values != np.floor(values)
+            if fractional.any():
+                errors.append(_describe(column, "non-integer value", fractional))
+            values = values.astype(int)
+
+        result[column] = values
+
+    if errors:
+        raise ScenarioValidationError(errors)
+
+    return result
@@ -100,4 +100,49 @@ class FinancialPlotter:
         ))
         
         fig.update_layout(height=400)
-        return fig
\ No newline at end of file
+        return fig
+    
+    @staticmethod
+    def plot_tornado(sensitivity_df: pd.DataFrame):
+        """Create tornado chart from SensitivityAnalyzer.analyze output."""
+        base_outcome = sensitivity_df.attrs.get('base_outcome', 0)
+        metric = sensitivity_df.attrs.get('metric', 'real_wealth').replace('_', ' ').title()
+        
+        # Plotly draws the first category at the bottom, so put the widest bar last
+        df = sensitivity_df.sort_values('swing')
+        labels = df['parameter'].str.replace('_', ' ').str.title()
+        
+        fig = go.Figure()
+        
+        fig.add_trace(go.Bar(
+            y=labels,
+            x=df['low_outcome'] - base_outcome,
+            base=base_outcome,
+            orientation='h',
+            name='Low Input',
+            marker_color='#d62728',
+            customdata=df[['low_value', 'low_outcome']],
+            hovertemplate='Input: %{customdata[0]:.4g}<br>Outcome: $%{customdata[1]:,.0f}<extra></extra>'
+        ))
+        
+        fig.add_trace(go.Bar(
+            y=labels,
+            x=df['high_outcome'] - base_outcome,
+            base=base_outcome,
+            orientation='h',
+            name='High Input',
+            marker_color='#2ca02c',
+            customdata=df[['high_value', 'high_outcome']],
+            hovertemplate='Input: %{customdata[0]:.4g}<br>Outcome: $%{customdata[1]:,.0f}<extra></extra>'
+        ))
+        
+        fig.add_vline(x=base_outcome, line_dash="dot", line_color="gray")
+        
+        fig.update_layout(
+            title=f'Sensitivity of Final {metric}',
+            xaxis_title=f'{metric} ($)',
+            barmode='overlay',
+            height=500
+        )
+        
+        return fig
@@ -1,7 +1,12 @@
 import pytest
 import sys
 sys.path.append('..')
+import numpy as np
+import pandas as pd
 from src.calculator.cash_flow import CashFlowCalculator
+from src.calculator.debt import DebtCalculator
+from src.calculator.monte_carlo import MonteCarloSimulator
+from src.calculator.sensitivity import SensitivityAnalyzer
 
 def test_basic_calculation():
     calc = CashFlowCalculator(income=50000, expenses=30000, savings_rate=0.2)
@@ -17,4 +22,251 @@ def test_fire_number():
     
     assert fire_num == 750000  # 30k / 0.04
 
+def test_batch_matches_serial_projection():
+    savings_rates = np.array([0.1, 0.2, 0.3])
+    years = np.array([5, 10, 20])
+    batch = CashFlowCalculator.calculate_wealth_projection_batch(
+        50000, savings_rates, years, 0.07, 0.03, 0.02
+    )
+    
+    for i in range(3):
+        calc = CashFlowCalculator(income=50000, expenses=30000, savings_rate=savings_rates[i])
+        df = calc.calculate_wealth_projection(int(years[i]), 0.07, 0.03, 0.02)
+        assert batch['nominal_wealth'][i] == pytest.approx(df['nominal_wealth'].iloc[-1])
+        assert batch['real_wealth'][i] == pytest.approx(df['real_wealth'].iloc[-1])
+        assert batch['total_contributions'][i] == pytest.approx(df['total_contributions'].iloc[-1])
+
+def test_sensitivity_analysis():
+    calc = CashFlowCalculator(income=50000, expenses=30000, savings_rate=0.2)
+    result = SensitivityAnalyzer(calc, 30, 0.07, 0.03).analyze()
+    
+    assert set(result['parameter']) == set(SensitivityAnalyzer.PARAMETERS)
+    assert list(result['swing']) == sorted(result['swing'], reverse=True)
+    
+    by_param = result.set_index('parameter')
+    assert by_param.loc['investment_return', 'partial_effect'] > 0
+    assert by_param.loc['inflation_rate', 'partial_effect'] < 0
+    
+    # Savings scale linearly, so the elasticity is exactly one
+    assert by_param.loc['savings_rate', 'elasticity'] == pytest.approx(1.0)
+
+def test_amortization_schedule_matches_recurrence():
+    schedule = DebtCalculator.amortization_schedule(
+        200000, 0.05, 360, extra_payment=100,
+        lump_sums={24: 10000}, rate_changes={61: 0.065}
+    )
+    
+    balance = 200000
+    for row in schedule.itertuples():
+        rate = 0.065 if row.month >= 61 else 0.05
+        balance = balance * (1 + rate / 12) - row.payment - row.prepayment
+        assert row.balance == pytest.approx(balance, abs=1e-6)
+    
+    assert schedule['balance'].iloc[-1] == 0
+    assert schedule['month'].iloc[-1] < 360  # prepayments shorten the loan
+
+def test_prepayment_strategies_match_schedule():
+    extras = np.array([0, 200, 500])
+    result = DebtCalculator.compare_prepayment_strategies(300000, 0.06, 360, extras, 0.07)
+    
+    for extra, row in zip(extras, result.itertuples()):
+        schedule = DebtCalculator.amortization_schedule(300000, 0.06, 360, extra_payment=extra)
+        assert row.payoff_month == len(schedule)
+        assert row.total_interest == pytest.approx(schedule['interest'].sum())
+    
+    assert result['interest_saved'].iloc[0] == pytest.approx(0, abs=1e-6)
+    # Investing at 7% beats prepaying a 6% loan
+    assert (result['prepay_advantage'].iloc[1:] < 0).all()
+
+def test_upfront_lump_sum_matches_schedule():
+    result = DebtCalculator.compare_prepayment_strategies(300000, 0.06, 360, [0, 300], 0.07, lump_sums=50000)
+    
+    for row in result.itertuples():
+        schedule = DebtCalculator.amortization_schedule(
+            300000, 0.06, 360, extra_payment=row.extra_payment, lump_sums={0: 50000}
+        )
+        assert schedule['prepayment'].iloc[0] == 50000
+        assert row.payoff_month == schedule['month'].iloc[-1]
+        assert row.total_interest == pytest.approx(schedule['interest'].sum())
+    
+    with pytest.raises(ValueError):
+        DebtCalculator.compare_prepayment_strategies(300000, 0.06, 360, [-2000], 0.07)
+    with pytest.raises(ValueError):
+        DebtCalculator.compare_prepayment_strategies(300000, 0.06, 360, 0, 0.07, lump_sums=-1000)
+
+def test_debt_payments_are_tracked_separately():
+    calc = CashFlowCalculator(income=60000, expenses=36000, savings_rate=0.3)
+    schedule = DebtCalculator.amortization_schedule(20000, 0.04, 60)
+    debt = DebtCalculator.payment_stream(schedule, 120)
+    
+    with_debt = calc.calculate_wealth_projection(10, 0.07, 0.03, debt_payments=debt)
+    without_debt = calc.calculate_wealth_projection(10, 0.07, 0.03)
+    batch = CashFlowCalculator.calculate_wealth_projection_batch(
+        60000, 0.3, 10, 0.07, 0.03, debt_payments=debt
+    )
+    
+    # Contributions stay gross; the debt paid out of them is its own column
+    final = with_debt.iloc[-1]
+    assert final['total_contributions'] == pytest.approx(without_debt['total_contributions'].iloc[-1])
+    assert final['total_debt_paid'] == pytest.approx(schedule['payment'].sum())
+    assert final['investment_gains'] == pytest.approx(
+        final['nominal_wealth'] - final['total_contributions'] + final['total_debt_paid']
+    )
+    assert (with_debt['debt_payment'].iloc[60:] == 0).all()
+    assert batch['nominal_wealth'][0] == pytest.approx(final['nominal_wealth'])
+    assert batch['total_debt_paid'][0] == pytest.approx(final['total_debt_paid'])
+
+def test_debt_above_savings_is_capped():
+    calc = CashFlowCalculator(income=60000, expenses=36000, savings_rate=0.2)
+    schedule = DebtCalculator.amortization_schedule(300000, 0.05, 300)
+    debt = DebtCalculator.payment_stream(schedule, 360)
+    
+    with pytest.warns(RuntimeWarning):
+        monthly = calc.calculate_wealth_projection(30, 0.07, 0.03, debt_payments=debt)
+    with pytest.warns(RuntimeWarning):
+        annual = calc.calculate_wealth_projection(30, 0.07, 0.03, debt_payments=debt, resolution='annual')
+    with pytest.warns(RuntimeWarning):
+        batch = CashFlowCalculator.calculate_wealth_projection_batch(
+            60000, 0.2, 30, 0.07, 0.03, debt_payments=debt, resolution='annual'
+        )
+    
+    # Savings never go below zero, so no borrowing at the investment return
+    assert (monthly['nominal_wealth'] >= 0).all()
+    assert (monthly['investment_gains'] >= -1e-6).all()
+    assert monthly['total_debt_paid'].iloc[-1] < schedule['payment'].sum()
+    year_ends = monthly[monthly['month'] % 12 == 0].reset_index(drop=True)
+    for column in ('nominal_wealth', 'total_contributions', 'total_debt_paid', 'investment_gains'):
+        assert np.allclose(annual[column], year_ends[column], rtol=1e-12)
+        assert batch[column][0] == pytest.approx(year_ends[column].iloc[-1], rel=1e-12)
+
+@pytest.mark.filterwarnings('ignore:Debt payments exceed savings')
+def test_annual_resolution_matches_monthly_year_ends():
+    calc = CashFlowCalculator(income=70000, expenses=30000, savings_rate=0.25)
+    schedule = DebtCalculator.amortization_schedule(50000, 0.05, 120, lump_sums={30: 5000})
+    debt = DebtCalculator.payment_stream(schedule, 360)
+    
+    monthly = calc.calculate_wealth_projection(30, 0.07, 0.03, 0.02, debt_payments=debt)
+    annual = calc.calculate_wealth_projection(30, 0.07, 0.03, 0.02, debt_payments=debt, resolution='annual')
+    year_ends = monthly[monthly['month'] % 12 == 0].reset_index(drop=True)
+    
+    assert len(annual) == 30
+    for column in year_ends.columns:
+        assert np.allclose(annual[column], year_ends[column], rtol=1e-12)
+    
+    detail = calc.calculate_monthly_detail(10, 12, 0.07, 0.03, 0.02, debt_payments=debt)
+    assert list(detail['month']) == list(range(121, 145))
+    assert np.allclose(detail['nominal_wealth'], monthly['nominal_wealth'].iloc[120:144], rtol=1e-12)
+    
+    resumed = calc.calculate_monthly_detail(10, 12, 0.07, 0.03, 0.02, debt_payments=debt, start_row=annual.iloc[9])
+    pd.testing.assert_frame_equal(resumed, detail)
+
+def test_batch_annual_resolution_matches_monthly():
+    args = (60000, np.array([0.1, 0.3]), np.array([7, 40]), np.array([0.0, 0.08]), 0.03, 0.02)
+    monthly = CashFlowCalculator.calculate_wealth_projection_batch(*args)
+    annual = CashFlowCalculator.calculate_wealth_projection_batch(*args, resolution='annual')
+    
+    for key in monthly:
+        assert np.allclose(annual[key], monthly[key], rtol=1e-12)
+
+@pytest.mark.parametrize('method', MonteCarloSimulator.METHODS)
+def test_monte_carlo_mean_matches_deterministic(method):
+    calc = CashFlowCalculator(income=60000, expenses=36000, savings_rate=0.3)
+    expected = calc.calculate_wealth_projection(10, 0.07, 0.03)['real_wealth'].iloc[-1]
+    
+    plain = MonteCarloSimulator(calc, 10, 0.07, 0.15, 0.03, seed=1).run(4096, method=method, batch_size=1024)
+    adjusted = MonteCarloSimulator(calc, 10, 0.07, 0.15, 0.03, seed=1).run(
+        4096, method=method, control_variate=True, batch_size=1024
+    )
+    
+    for result in (plain, adjusted):
+        assert result['n_paths'] == 4096
+        assert abs(result['mean_final_wealth'] - expected) < 4 * result['std_error']
+    assert adjusted['std_error'] < plain['std_error'] / 5
+
+def test_monte_carlo_stops_at_tolerance():
+    calc = CashFlowCalculator(income=60000, expenses=36000, savings_rate=0.3)
+    result = MonteCarloSimulator(calc, 10, 0.07, 0.15, 0.03, seed=1).run(
+        method='antithetic', control_variate=True, tolerance=0.001, batch_size=1024
+    )
+    
+    assert result['converged']
+    assert result['n_paths'] < 1_000_000
+    assert result['std_error'] <= 0.001 * result['mean_final_wealth']
+    assert 0 <= result['fire_probability'] <= 1
+
+@pytest.mark.parametrize('method', ['pseudo', 'antithetic'])
+@pytest.mark.parametrize('n_paths', [1000, 10000])
+def test_monte_carlo_runs_requested_paths(method, n_paths):
+    calc = CashFlowCalculator(income=60000, expenses=36000, savings_rate=0.3)
+    result = MonteCarloSimulator(calc, 5, 0.07, 0.15, 0.03, seed=1).run(n_paths, method=method)
+    
+    assert result['n_paths'] == n_paths
+    assert result['mean_final_wealth'] > 0
+
+def test_sobol_uses_equal_replicates():
+    calc = CashFlowCalculator(income=60000, expenses=36000, savings_rate=0.3)
+    
+    # Path counts round up to whole power-of-two replicates
+    assert MonteCarloSimulator(calc, 5, 0.07, 0.15, 0.03, seed=1).run(1000, method='sobol')['n_paths'] == 1024
+    assert MonteCarloSimulator(calc, 5, 0.07, 0.15, 0.03, seed=1).run(10000, method='sobol')['n_paths'] == 12288
+    
+    # More paths must not make the estimate worse
+    spread = {}
+    for n_paths in (8192, 10000):
+        means = [
+            MonteCarloSimulator(calc, 5, 0.07, 0.15, 0.03, seed=seed).run(n_paths, method='sobol')['mean_final_wealth']
+            for seed in range(20)
+        ]
+        spread[n_paths] = np.std(means, ddof=1)
+    assert spread[10000] <= 1.5 * spread[8192]
+
+def test_monte_carlo_zero_return():
+    calc = CashFlowCalculator(income=60000, expenses=36000, savings_rate=0.3)
+    sim = MonteCarloSimulator(calc, 10, 0.0, 0.15, 0.03, seed=1)
+    
+    assert sim.control_mean == pytest.approx(calc.monthly_savings * 120)
+    result = sim.run(4096, method='antithetic', control_variate=True, batch_size=1024)
+    expected = calc.calculate_wealth_projection(10, 0.0, 0.03)['real_wealth'].iloc[-1]
+    assert abs(result['mean_final_wealth'] - expected) < 4 * result['std_error']
+
+@pytest.mark.filterwarnings('ignore:Debt payments exceed savings')
+@pytest.mark.parametrize('resolution', ['monthly', 'annual'])
+def test_float32_batch_matches_float64(resolution):
+    rng = np.random.default_rng(0)
+    n = 1000
+    args = (
+        rng.uniform(30000, 200000, n), rng.uniform(0, 0.5, n), rng.integers(1, 51, n),
+        rng.uniform(-0.02, 0.12, n), rng.uniform(0, 0.05, n), rng.uniform(0, 0.05, n)
+    )
+    debt = DebtCalculator.payment_stream(DebtCalculator.amortization_schedule(50000, 0.05, 120), 600)
+    
+    reference = CashFlowCalculator.calculate_wealth_projection_batch(
+        *args, debt_payments=debt, resolution=resolution
+    )
+    result = CashFlowCalculator.calculate_wealth_projection_batch(
+        *args, debt_payments=debt, resolution=resolution, precision='float32'
+    )
+    
+    assert result['nominal_wealth'].dtype == np.float32
+    assert 0 < result['max_relative_error'] < 1e-5
+    assert np.allclose(result['nominal_wealth'], reference['nominal_wealth'], rtol=1e-5, atol=1.0)
+    
+    paths = CashFlowCalculator.calculate_wealth_projection_batch(
+        *(x[:10] for x in args), keep_paths=True, resolution=resolution, precision='float32'
+    )
+    assert paths['max_relative_error'] < 1e-5
+    assert all(paths[key].dtype == np.float32 for key in ('real_wealth', 'investment_gains', 'total_debt_paid'))
+
+def test_float32_monte_carlo():
+    calc = CashFlowCalculator(income=60000, expenses=36000, savings_rate=0.3)
+    result = MonteCarloSimulator(calc, 30, 0.07, 0.15, 0.03, seed=1).run(
+        2048, method='antithetic', batch_size=1024, precision='float32'
+    )
+    
+    assert all(value.dtype == np.float32 for value in result['percentiles'].values())
+    assert 0 < result['max_relative_error'] < 1e-5
+    
+    with pytest.raises(ValueError):
+        MonteCarloSimulator(calc, 30, 0.07, 0.15, 0.03).run(precision='float16')
+
 # Run with: pytest tests/
\ No newline at end of file
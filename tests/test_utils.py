@@ -0,0 +1,123 @@
+import pytest
+import sys
+sys.path.append('..')
+import json
+import os
+import numpy as np
+import pandas as pd
+from src.calculator.cash_flow import CashFlowCalculator
+from src.utils.cache import ResultCache
+from src.utils.formatters import format_currency, format_percent, format_scenarios
+from src.utils.scenarios import compile_scenarios, load_scenarios
+from src.utils.validators import ScenarioValidationError, validate_scenarios
+
+def test_cache_shares_results_across_instances(tmp_path):
+    calls = []
+    
+    def compute():
+        calls.append(1)
+        return pd.DataFrame({'nominal_wealth': [1.0, 2.0]})
+    
+    params = {'income': 60000, 'savings_rate': 0.3, 'years': 30}
+    first = ResultCache(cache_dir=str(tmp_path)).get_or_compute('projection', params, compute)
+    
+    # A fresh instance stands in for another session or a restarted server
+    second = ResultCache(cache_dir=str(tmp_path)).get_or_compute('projection', dict(reversed(params.items())), compute)
+    
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+def test_cache_key_normalises_numbers(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path))
+    key = cache.make_key('projection', {'years': 30, 'savings_rate': 0.3})
+    
+    assert cache.make_key('projection', {'years': 30.0, 'savings_rate': 0.3}) == key
+    assert cache.make_key('projection', {'years': np.int64(30), 'savings_rate': np.float64(0.3)}) == key
+    assert cache.make_key('projection', {'years': 31, 'savings_rate': 0.3}) != key
+
+def test_cache_key_includes_engine_version(tmp_path):
+    params = {'income': 60000}
+    old = ResultCache(cache_dir=str(tmp_path), engine_version='1')
+    new = ResultCache(cache_dir=str(tmp_path), engine_version='2')
+    
+    assert old.make_key('projection', params) != new.make_key('projection', params)
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path), max_bytes=2500)
+    
+    cache.set('a', b'x' * 1000)
+    cache.set('b', b'x' * 1000)
+    cache.get('a')
+    cache.set('c', b'x' * 1000)
+    
+    assert cache.get('a') is not None
+    assert cache.get('b') is None
+    assert cache.get('c') is not None
+
+def test_load_sample_scenarios():
+    df = load_scenarios(os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_scenarios.json'))
+    
+    assert len(df) > 0
+    assert df['name'].iloc[0] == 'Default'
+    assert df['years'].dtype.kind == 'i'
+
+def test_columnar_scenarios_compile_to_batch(tmp_path):
+    path = tmp_path / 'library.json'
+    path.write_text(json.dumps({'columns': {
+        'income': [50000, 80000],
+        'savings_rate': [0.2, 0.3],
+        'years': [10, 20],
+        'investment_return': [0.07, 0.05],
+        'inflation_rate': [0.03, 0.02]
+    }}))
+    
+    arrays = compile_scenarios(load_scenarios(str(path)))
+    batch = CashFlowCalculator.calculate_wealth_projection_batch(**arrays)
+    
+    # income_growth falls back to the schema default
+    assert np.all(arrays['income_growth'] == 0.03)
+    calc = CashFlowCalculator(income=80000, expenses=0, savings_rate=0.3)
+    expected = calc.calculate_wealth_projection(20, 0.05, 0.02)['nominal_wealth'].iloc[-1]
+    assert batch['nominal_wealth'][1] == pytest.approx(expected)
+
+def test_validation_reports_bad_columns():
+    df = pd.DataFrame({
+        'income': [50000, -1, 60000],
+        'savings_rate': [0.2, 0.3, 1.5],
+        'years': [10, 10.5, 20],
+        'investment_return': [0.07, 0.07, 'abc'],
+    })
+    
+    with pytest.raises(ScenarioValidationError) as excinfo:
+        validate_scenarios(df)
+    
+    message = str(excinfo.value)
+    for column in ('income', 'savings_rate', 'years', 'investment_return', 'inflation_rate'):
+        assert column in message
+
+def test_validation_rejects_duplicate_names():
+    df = pd.DataFrame({
+        'name': ['Default', 'Saver', 'Default'],
+        'income': [50000, 60000, 70000],
+        'savings_rate': [0.2, 0.3, 0.4],
+        'years': [10, 20, 30],
+        'investment_return': [0.07, 0.07, 0.07],
+        'inflation_rate': [0.03, 0.03, 0.03]
+    })
+    
+    with pytest.raises(ScenarioValidationError) as excinfo:
+        validate_scenarios(df)
+    
+    assert excinfo.value.errors == ["name: duplicate name in 2 row(s) (rows 0, 2)"]
+
+def test_formatters():
+    assert format_currency(1234567.8) == '$1,234,568'
+    assert format_percent(0.07) == '7.0%'
+    assert list(format_currency(np.array([1000, 2500.5]), decimals=2)) == ['$1,000.00', '$2,500.50']
+
+def test_format_scenarios():
+    df = pd.DataFrame({'name': ['Default'], 'income': [60000.0], 'savings_rate': [0.3], 'years': [30]})
+    display = format_scenarios(df)
+    
+    assert display.iloc[0].tolist() == ['Default', '$60,000', '30.0%', 30]
+    assert df['income'].iloc[0] == 60000.0
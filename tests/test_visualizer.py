@@ -0,0 +1,19 @@
+import pytest
+import sys
+sys.path.append('..')
+from src.calculator.cash_flow import CashFlowCalculator
+from src.calculator.sensitivity import SensitivityAnalyzer
+from src.visualizer.plotter import FinancialPlotter
+
+def test_tornado_chart():
+    calc = CashFlowCalculator(income=50000, expenses=30000, savings_rate=0.2)
+    result = SensitivityAnalyzer(calc, 30, 0.07, 0.03).analyze()
+    fig = FinancialPlotter.plot_tornado(result)
+    
+    assert len(fig.data) == 2
+    assert len(fig.data[0].y) == len(SensitivityAnalyzer.PARAMETERS)
+    assert fig.layout.title.text == 'Sensitivity of Final Real Wealth'
+    
+    fig = FinancialPlotter.plot_tornado(SensitivityAnalyzer(calc, 30, 0.07, 0.03).analyze('total_contributions'))
+    assert fig.layout.title.text == 'Sensitivity of Final Total Contributions'
+    assert fig.layout.xaxis.title.text == 'Total Contributions ($)'